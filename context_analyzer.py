@@ -3,10 +3,28 @@ Business Context Analyzer for PRISM
 Analyzes business context for accurate vulnerability risk scoring.
 """
 
+import ipaddress
 import logging
+from functools import lru_cache
 from typing import Dict, List
 from enum import Enum
 
+import numpy as np
+
+PRIVATE_NETWORKS = tuple(ipaddress.ip_network(network) for network in (
+    '10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16', '127.0.0.0/8', '169.254.0.0/16',
+    '::1/128', 'fc00::/7', 'fe80::/10'
+))
+
+@lru_cache(maxsize=4096)
+def _is_private_ip(ip: str) -> bool:
+    """Check whether an address falls inside a private or local range."""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in PRIVATE_NETWORKS)
+
 class ExposureLevel(Enum):
     INTERNAL = "internal"
     EXTERNAL = "external" 
@@ -19,6 +37,15 @@ class BusinessCriticality(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+# Asset-type keywords in precedence order: the first one found in a type sets its criticality
+CRITICALITY_KEYWORDS = {
+    'payment': BusinessCriticality.CRITICAL.value,
+    'financial': BusinessCriticality.CRITICAL.value,
+    'database': BusinessCriticality.HIGH.value,
+    'auth': BusinessCriticality.HIGH.value,
+    'web': BusinessCriticality.MEDIUM.value
+}
+
 class BusinessContextAnalyzer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -33,22 +60,49 @@ class BusinessContextAnalyzer:
         }
         return context
     
+    def analyze_assets_batch(self, assets: List[Dict]) -> List[Dict]:
+        """Analyze business context for a whole asset inventory at once."""
+        if not assets:
+            return []
+        
+        # Column of asset types; criticality is classified across the whole column
+        types = np.char.lower(np.array([asset.get('type', '') for asset in assets], dtype=str))
+        
+        # np.select takes the first matching condition, preserving the table's precedence
+        criticality = np.select(
+            [np.char.find(types, keyword) >= 0 for keyword in CRITICALITY_KEYWORDS],
+            list(CRITICALITY_KEYWORDS.values()),
+            default=BusinessCriticality.LOW.value
+        ).tolist()
+        
+        return [
+            {
+                'asset_id': asset.get('id'),
+                'criticality': asset_criticality,
+                'exposure_level': self._determine_exposure(asset),
+                'business_functions': asset.get('business_functions', [])
+            }
+            for asset, asset_criticality in zip(assets, criticality)
+        ]
+    
     def _assess_criticality(self, asset: Dict) -> str:
         """Assess business criticality."""
-        asset_type = asset.get('type', '').lower()
-        if 'payment' in asset_type or 'financial' in asset_type:
-            return BusinessCriticality.CRITICAL.value
-        elif 'database' in asset_type or 'auth' in asset_type:
-            return BusinessCriticality.HIGH.value
-        elif 'web' in asset_type:
-            return BusinessCriticality.MEDIUM.value
-        else:
-            return BusinessCriticality.LOW.value
+        return self._criticality_for_type(asset.get('type', ''))
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _criticality_for_type(asset_type: str) -> str:
+        """Map an asset type to its criticality; asset types form a small vocabulary."""
+        asset_type = asset_type.lower()
+        for keyword, criticality in CRITICALITY_KEYWORDS.items():
+            if keyword in asset_type:
+                return criticality
+        return BusinessCriticality.LOW.value
     
     def _determine_exposure(self, asset: Dict) -> str:
         """Determine exposure level."""
         ip_addresses = asset.get('ip_addresses', [])
         for ip in ip_addresses:
-            if not ip.startswith(('10.', '172.', '192.168.')):
+            if not _is_private_ip(ip):
                 return ExposureLevel.INTERNET_FACING.value
         return ExposureLevel.INTERNAL.value
@@ -3,66 +3,124 @@ Data Ingestion Module for PRISM
 Support for JSON, CSV, and API data sources.
 """
 
-import json
 import csv
-import requests
+import io
+import aiohttp
+import ijson
+import orjson
 import logging
-from typing import Dict, List
+from itertools import chain
+from typing import BinaryIO, Dict, Iterable, Iterator
 from pathlib import Path
 
+from http_client import create_session, fetch_bytes
+
+# Source columns read by process_vulnerabilities; everything else is dropped at parse time
+CSV_FIELDS = (
+    'id', 'cve_id', 'vulnerability_id', 'title', 'summary', 'description',
+    'severity', 'cvss_score', 'published_date', 'date'
+)
+
+# Common severity spellings mapped to their normalized form; others fall back to str.lower
+SEVERITY_LEVELS = ('critical', 'high', 'medium', 'low', 'info', 'none')
+SEVERITY_MAP = {
+    spelling: level
+    for level in SEVERITY_LEVELS
+    for spelling in (level, level.upper(), level.capitalize())
+}
+
 class VulnerabilityDataIngester:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.supported_formats = ['json', 'csv', 'api']
+        self._session = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled HTTP session on first use."""
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+        return self._session
     
-    def ingest_json(self, file_path: str) -> List[Dict]:
-        """Ingest vulnerabilities from JSON file."""
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    def ingest_json(self, file_path: str) -> Iterator[Dict]:
+        """Stream vulnerabilities from JSON file one record at a time."""
+        with open(file_path, 'rb') as f:
+            yield from self._iter_json_records(f)
+    
+    def _iter_json_records(self, f: BinaryIO) -> Iterator[Dict]:
+        """Stream records from a JSON list, a {"vulnerabilities": [...]} object, or a single object."""
+        # ijson raises IncompleteJSONError for an empty document, as json.load would
+        events = ijson.parse(f, use_float=True)
+        first = next(events)
         
-        if isinstance(data, list):
-            return data
-        elif 'vulnerabilities' in data:
-            return data['vulnerabilities']
+        _, event, value = first
+        if event == 'start_array':
+            yield from ijson.items(chain([first], events), 'item')
+        elif event == 'start_map':
+            # Skip over top-level values until the vulnerabilities array shows up
+            for prefix, event, value in events:
+                if prefix == '' and event == 'map_key' and value == 'vulnerabilities':
+                    yield from ijson.items(events, 'vulnerabilities.item')
+                    return
+            
+            # No vulnerabilities key: the document is a single record
+            f.seek(0)
+            yield orjson.loads(f.read())
         else:
-            return [data]
+            yield value
     
-    def ingest_csv(self, file_path: str) -> List[Dict]:
-        """Ingest vulnerabilities from CSV file."""
-        vulnerabilities = []
-        with open(file_path, 'r') as f:
-            reader = csv.DictReader(f)
+    def ingest_csv(self, file_path: str) -> Iterator[Dict]:
+        """Stream vulnerabilities from CSV file."""
+        with open(file_path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            
+            columns = [(name, header.index(name)) for name in CSV_FIELDS if name in header]
             for row in reader:
-                vulnerabilities.append(dict(row))
-        return vulnerabilities
+                if not row:
+                    continue
+                row_len = len(row)
+                yield {name: row[index] for name, index in columns if index < row_len}
     
-    def ingest_api(self, api_url: str) -> List[Dict]:
+    async def ingest_api(self, api_url: str) -> Iterator[Dict]:
         """Ingest vulnerabilities from API endpoint."""
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
+        body = await fetch_bytes(self._get_session(), api_url)
         
-        if isinstance(data, list):
-            return data
-        elif 'vulnerabilities' in data:
-            return data['vulnerabilities']
-        else:
-            return [data]
+        # The whole response body is buffered: only the JSON decoding is lazy, so peak memory
+        # still grows with the API response (unlike file sources, which stream from disk)
+        return self._iter_json_records(io.BytesIO(body))
     
-    def process_vulnerabilities(self, vulns: List[Dict]) -> List[Dict]:
+    def process_vulnerabilities(self, vulns: Iterable[Dict]) -> Iterator[Dict]:
         """Process and normalize vulnerability data."""
-        processed = []
+        # Bind hot-loop callables to locals to skip repeated global/attribute lookups
+        lower = str.lower
+        to_float = float
+        severity_map = SEVERITY_MAP
+        
+        processed = 0
         for vuln in vulns:
+            get = vuln.get
+            vuln_id = get('id') or get('cve_id') or get('vulnerability_id')
+            if not vuln_id:
+                continue
+            
+            severity = get('severity', 'medium')
+            
             # Normalize field names
-            normalized = {
-                'id': vuln.get('id') or vuln.get('cve_id') or vuln.get('vulnerability_id'),
-                'title': vuln.get('title') or vuln.get('summary') or vuln.get('description', '')[:100],
-                'severity': vuln.get('severity', 'medium').lower(),
-                'cvss_score': float(vuln.get('cvss_score', 0)),
-                'published_date': vuln.get('published_date') or vuln.get('date')
+            processed += 1
+            yield {
+                'id': vuln_id,
+                'title': get('title') or get('summary') or get('description', '')[:100],
+                'severity': severity_map.get(severity) or lower(severity),
+                'cvss_score': to_float(get('cvss_score', 0)),
+                'published_date': get('published_date') or get('date')
             }
-            if normalized['id']:
-                processed.append(normalized)
         
-        self.logger.info(f"Processed {len(processed)} vulnerabilities")
-        return processed
+        self.logger.info(f"Processed {processed} vulnerabilities")
@@ -3,78 +3,286 @@ Database Manager for PRISM
 SQLite-based vulnerability storage system.
 """
 
+from __future__ import annotations
+
+import asyncio
 import sqlite3
 import logging
-from datetime import datetime
+import threading
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from itertools import chain, islice
 from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sized
+
+import aiosqlite
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,
+    'cache_size': -131072
+}
+
+# Readers share the database-wide WAL mode; these are per-connection settings
+READER_PRAGMAS = {
+    'query_only': 'ON',
+    'temp_store': 'MEMORY',
+    'mmap_size': 268435456,
+    'cache_size': -65536
+}
+READER_POOL_SIZE = 4
+
+# SQLite caps bound parameters at 999 per statement on older builds
+VULN_COLUMNS = ('id', 'title', 'severity', 'cvss_score', 'published_date')
+INSERT_CHUNK_ROWS = 999 // len(VULN_COLUMNS)
+
+# Refresh planner statistics once a write touches at least this many rows
+ANALYZE_MIN_ROWS = 1000
+
+# Secondary indexes, rebuilt after the load for inserts of at least DEFER_INDEX_ROWS rows
+INDEXES = {
+    'idx_vuln_severity': "CREATE INDEX IF NOT EXISTS idx_vuln_severity ON vulnerabilities(severity)",
+    'idx_vuln_created': "CREATE INDEX IF NOT EXISTS idx_vuln_created ON vulnerabilities(created_date)",
+    'idx_vuln_cvss': "CREATE INDEX IF NOT EXISTS idx_vuln_cvss ON vulnerabilities(cvss_score)"
+}
+DEFER_INDEX_ROWS = 100000
+
+# Rows fetched per pooled-connection checkout when streaming top risks
+TOP_RISKS_PAGE_ROWS = 500
 
 class DatabaseManager:
     def __init__(self, db_path="data/prism.db"):
         self.db_path = db_path
         self.logger = logging.getLogger(__name__)
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # One shared connection in autocommit mode; transactions are explicit
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        for pragma, value in PRAGMAS.items():
+            self.conn.execute(f"PRAGMA {pragma}={value}")
+        self._lock = threading.Lock()
+        self._insert_sql = {}
+        
+        # Async read-only connections, opened on first use inside the event loop
+        self._pool = None
+        self._pool_lock = None
+        
         self.initialize_schema()
     
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
+    
+    async def aclose(self):
+        """Close the reader pool and the writer connection."""
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            for _ in range(READER_POOL_SIZE):
+                conn = await pool.get()
+                await conn.close()
+        self.close()
+    
+    async def _get_pool(self) -> asyncio.Queue:
+        """Open the reader connection pool on first use."""
+        if self._pool is None:
+            # Created lazily so it belongs to the running loop; concurrent first callers wait here
+            if self._pool_lock is None:
+                self._pool_lock = asyncio.Lock()
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await self._open_pool()
+        return self._pool
+    
+    async def _open_pool(self) -> asyncio.Queue:
+        """Open every reader connection, closing those already opened if one fails."""
+        pool = asyncio.Queue()
+        try:
+            for _ in range(READER_POOL_SIZE):
+                conn = await aiosqlite.connect(self.db_path)
+                pool.put_nowait(conn)
+                for pragma, value in READER_PRAGMAS.items():
+                    await conn.execute(f"PRAGMA {pragma}={value}")
+        except BaseException:
+            while not pool.empty():
+                await pool.get_nowait().close()
+            raise
+        return pool
+    
+    @asynccontextmanager
+    async def _acquire(self):
+        """Borrow a read-only connection from the pool."""
+        pool = await self._get_pool()
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put_nowait(conn)
+    
     def initialize_schema(self):
         """Initialize database schema."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        with self._lock:
+            self.conn.execute("""
                 CREATE TABLE IF NOT EXISTS vulnerabilities (
                     id TEXT PRIMARY KEY,
                     title TEXT,
                     severity TEXT,
                     cvss_score REAL,
                     published_date TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    created_date TEXT GENERATED ALWAYS AS (date(created_at)) VIRTUAL
                 )
             """)
-            conn.commit()
+            
+            # Databases created before created_date existed need it added in place
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_xinfo(vulnerabilities)")}
+            if 'created_date' not in columns:
+                self.conn.execute("""
+                    ALTER TABLE vulnerabilities
+                    ADD COLUMN created_date TEXT GENERATED ALWAYS AS (date(created_at)) VIRTUAL
+                """)
+            
+            for create_sql in INDEXES.values():
+                self.conn.execute(create_sql)
             self.logger.info("Database schema initialized")
     
     def store_vulnerability(self, vuln_data):
         """Store vulnerability in database."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO vulnerabilities 
-                (id, title, severity, cvss_score, published_date)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
+        self.store_vulnerabilities([vuln_data])
+    
+    def store_vulnerabilities(self, vulns: Iterable[Dict], defer_indexes: Optional[bool] = None) -> int:
+        """Store many vulnerabilities in a single transaction."""
+        # Large loads drop secondary indexes and rebuild them once at the end
+        if defer_indexes is None:
+            defer_indexes = isinstance(vulns, Sized) and len(vulns) >= DEFER_INDEX_ROWS
+        
+        rows = (
+            (
                 vuln_data.get('id'),
                 vuln_data.get('title', ''),
                 vuln_data.get('severity', 'medium'),
                 vuln_data.get('cvss_score', 0.0),
                 vuln_data.get('published_date', datetime.now().isoformat())
-            ))
-            conn.commit()
+            )
+            for vuln_data in vulns
+        )
+        
+        stored = 0
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                if defer_indexes:
+                    for index_name in INDEXES:
+                        self.conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+                
+                while True:
+                    chunk = list(islice(rows, INSERT_CHUNK_ROWS))
+                    if not chunk:
+                        break
+                    self.conn.execute(self._get_insert_sql(len(chunk)), list(chain.from_iterable(chunk)))
+                    stored += len(chunk)
+                
+                if defer_indexes:
+                    for create_sql in INDEXES.values():
+                        self.conn.execute(create_sql)
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            
+            if stored >= ANALYZE_MIN_ROWS:
+                self.conn.execute("ANALYZE")
+        return stored
+    
+    def _get_insert_sql(self, row_count: int) -> str:
+        """Build (and cache) a multi-row INSERT for the given row count."""
+        sql = self._insert_sql.get(row_count)
+        if sql is None:
+            placeholders = "(" + ", ".join("?" * len(VULN_COLUMNS)) + ")"
+            sql = (
+                f"INSERT OR REPLACE INTO vulnerabilities ({', '.join(VULN_COLUMNS)}) VALUES "
+                + ", ".join([placeholders] * row_count)
+            )
+            self._insert_sql[row_count] = sql
+        return sql
 
-# Enhanced Database Operations
+    # Enhanced Database Operations
     async def get_risk_trends(self, days: int = 30):
         """Get risk score trends over time."""
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        cutoff_date = (date.today() - timedelta(days=days)).isoformat()
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT date(created_at) as date, 
+        async with self._acquire() as conn:
+            async with conn.execute("""
+                SELECT created_date as date, 
                        AVG(cvss_score) as avg_score,
                        COUNT(*) as count
                 FROM vulnerabilities 
-                WHERE created_at >= ?
-                GROUP BY date(created_at)
-                ORDER BY date
-            """, (cutoff_date,))
+                WHERE created_date >= ?
+                GROUP BY created_date
+                ORDER BY created_date
+            """, (cutoff_date,)) as cursor:
+                trends = await cursor.fetchall()
+        
+        return [{'date': t[0], 'avg_score': t[1], 'count': t[2]} for t in trends]
+    
+    async def aggregate_stats(self) -> Dict:
+        """Count vulnerabilities in total and per dashboard severity level."""
+        stats = {'total': 0, 'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+        async with self._acquire() as conn:
+            async with conn.execute("SELECT severity, COUNT(*) FROM vulnerabilities GROUP BY severity") as cursor:
+                async for severity, count in cursor:
+                    stats['total'] += count
+                    if severity in ('critical', 'high', 'medium', 'low'):
+                        stats[severity] += count
+        return stats
+    
+    async def get_top_risks(self, limit: int = 10) -> List[Dict]:
+        """Get the highest scoring vulnerabilities."""
+        return [risk async for risk in self.iter_top_risks(limit)]
+    
+    async def iter_top_risks(self, limit: int = 10) -> AsyncIterator[Dict]:
+        """Yield the highest scoring vulnerabilities one row at a time."""
+        # Rows are fetched in keyset pages so a pooled connection is never held while the
+        # caller is busy with a row (e.g. writing it to a slow client)
+        remaining, last = limit, None
+        while remaining > 0:
+            page_size = min(remaining, TOP_RISKS_PAGE_ROWS)
+            if last is None:
+                where, params = "", ()
+            elif last[0] is None:
+                # NULL scores sort last under DESC; page through them by id alone
+                where, params = "WHERE cvss_score IS NULL AND id > ?", (last[1],)
+            else:
+                where = "WHERE cvss_score < ? OR (cvss_score = ? AND id > ?) OR cvss_score IS NULL"
+                params = (last[0], last[0], last[1])
+            
+            async with self._acquire() as conn:
+                rows = await conn.execute_fetchall(f"""
+                    SELECT id, title, severity, cvss_score
+                    FROM vulnerabilities
+                    {where}
+                    ORDER BY cvss_score DESC, id
+                    LIMIT ?
+                """, params + (page_size,))
             
-            trends = cursor.fetchall()
-            return [{'date': t[0], 'avg_score': t[1], 'count': t[2]} for t in trends]
+            for r in rows:
+                yield {'id': r[0], 'title': r[1], 'severity': r[2], 'cvss_score': r[3]}
+            if len(rows) < page_size:
+                return
+            remaining -= len(rows)
+            last = (rows[-1][3], rows[-1][0])
     
     def get_vulnerability_stats(self):
         """Get comprehensive vulnerability statistics."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock:
             # Total vulnerabilities
-            total = conn.execute("SELECT COUNT(*) FROM vulnerabilities").fetchone()[0]
+            total = self.conn.execute("SELECT COUNT(*) FROM vulnerabilities").fetchone()[0]
             
             # By severity
             severity_stats = {}
-            cursor = conn.execute("SELECT severity, COUNT(*) FROM vulnerabilities GROUP BY severity")
+            cursor = self.conn.execute("SELECT severity, COUNT(*) FROM vulnerabilities GROUP BY severity")
             for row in cursor:
                 severity_stats[row[0]] = row[1]
             
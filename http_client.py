@@ -0,0 +1,47 @@
+"""
+HTTP Client for PRISM
+Shared aiohttp session setup for threat feeds and API ingestion.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+import aiohttp
+import orjson
+
+POOL_SIZE = 10
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+def create_session() -> aiohttp.ClientSession:
+    """Create a keep-alive session with a bounded connection pool."""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=POOL_SIZE, limit_per_host=POOL_SIZE),
+        timeout=aiohttp.ClientTimeout(total=30),
+        headers={'Accept-Encoding': 'gzip'}
+    )
+
+async def fetch_bytes(session: aiohttp.ClientSession, url: str) -> bytes:
+    """Fetch a response body, retrying transient failures with exponential backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        last_attempt = attempt == MAX_RETRIES
+        try:
+            async with session.get(url) as response:
+                if last_attempt or response.status not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return await response.read()
+                logger.warning(f"Retrying {url} after HTTP {response.status}")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if last_attempt:
+                raise
+            logger.warning(f"Retrying {url} after {e!r}")
+
+        await asyncio.sleep(BACKOFF_FACTOR * 2 ** attempt)
+
+async def fetch_json(session: aiohttp.ClientSession, url: str) -> Any:
+    """Fetch and decode a JSON document."""
+    return orjson.loads(await fetch_bytes(session, url))
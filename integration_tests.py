@@ -5,10 +5,26 @@ Comprehensive test suite with realistic vulnerability scenarios.
 
 import asyncio
 import json
+import os
 import pytest
+import ijson
+import msgspec
 import tempfile
 from datetime import datetime
 from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.testclient import TestClient
+
+import database
+import prism
+import web_dashboard
+from context_analyzer import CRITICALITY_KEYWORDS, BusinessContextAnalyzer
+from data_ingestion import VulnerabilityDataIngester
+from database import DatabaseManager
+from report_generator import ReportGenerator
+from risk_engine import AdvancedRiskEngine
 
 class TestPRISMIntegration:
     """Integration tests for PRISM platform."""
@@ -54,5 +70,297 @@ class TestPRISMIntegration:
         # Test scoring logic
         assert test_vuln['cvss_score'] == 9.0
 
+    def test_bulk_store_vulnerabilities(self):
+        """Test batched vulnerability storage."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = DatabaseManager(str(Path(tmp_dir) / 'prism.db'))
+            stored = db.store_vulnerabilities(self.create_sample_vulnerabilities())
+            
+            assert stored == 2
+            assert db.get_vulnerability_stats()['total'] == 2
+            db.close()
+
+    def test_store_vulnerabilities_deferred_indexes(self):
+        """Test that a deferred-index load from a generator rebuilds every index."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = DatabaseManager(str(Path(tmp_dir) / 'prism.db'))
+            vulns = (vuln for vuln in self.create_sample_vulnerabilities())
+            
+            assert db.store_vulnerabilities(vulns, defer_indexes=True) == 2
+            indexes = {row[0] for row in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            assert set(database.INDEXES) <= indexes
+            db.close()
+
+    def test_reader_pool_recovers_from_failed_open(self, monkeypatch):
+        """Test that a failed pool open leaves no partial pool behind."""
+        connect = database.aiosqlite.connect
+        opened = []
+        
+        def flaky_connect(*args, **kwargs):
+            if len(opened) == database.READER_POOL_SIZE - 1:
+                raise OSError("connect failed")
+            opened.append(connect(*args, **kwargs))
+            return opened[-1]
+        
+        async def run(db):
+            monkeypatch.setattr(database.aiosqlite, 'connect', flaky_connect)
+            with pytest.raises(OSError):
+                await db.aggregate_stats()
+            assert db._pool is None
+            for conn in opened:
+                with pytest.raises(ValueError):
+                    await conn.execute("SELECT 1")
+            
+            monkeypatch.setattr(database.aiosqlite, 'connect', connect)
+            assert (await db.aggregate_stats())['total'] == 0
+            await db.aclose()
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            asyncio.run(run(DatabaseManager(str(Path(tmp_dir) / 'prism.db'))))
+
+    def test_batch_scoring_matches_scalar(self):
+        """Test vectorized scoring against the per-vulnerability path."""
+        engine = AdvancedRiskEngine()
+        vulnerabilities = self.create_sample_vulnerabilities() + [
+            {'id': 'CVE-2024-0003', 'cvss_score': 4.0},
+            {'id': 'CVE-2024-0004', 'cvss_score': 3.9}
+        ]
+        contexts = [
+            {'asset_criticality': 'high', 'exposure_level': 'internet_facing'},
+            None,
+            {'asset_criticality': 'low'},
+            {'exposure_level': 'external'}
+        ]
+        
+        batch = engine.calculate_enhanced_risk_scores_batch(vulnerabilities, contexts)
+        for i, (vuln, context) in enumerate(zip(vulnerabilities, contexts)):
+            expected = engine.calculate_enhanced_risk_score(vuln, context)
+            assert batch['enhanced_score'][i] == expected['enhanced_score']
+            assert batch['risk_level'][i] == expected['risk_level']
+        
+        assert list(engine.categorize_risk_batch([3.9, 4.0, 7.0, 9.0])) == ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
+
+    def test_exposure_private_ranges(self):
+        """Test exposure classification against private address ranges."""
+        analyzer = BusinessContextAnalyzer()
+        
+        for ip in ('10.1.2.3', '172.16.0.1', '172.31.255.255', '192.168.1.10', '127.0.0.1'):
+            assert analyzer._determine_exposure({'ip_addresses': [ip]}) == 'internal'
+        for ip in ('172.15.0.1', '172.32.0.1', '8.8.8.8'):
+            assert analyzer._determine_exposure({'ip_addresses': [ip]}) == 'internet_facing'
+    
+    def test_batch_context_matches_per_asset(self):
+        """Test batch asset analysis against the per-asset path."""
+        analyzer = BusinessContextAnalyzer()
+        assets = [
+            {'id': 'a1', 'type': 'Payment-Gateway', 'ip_addresses': ['203.0.113.5']},
+            {'id': 'a2', 'type': 'database-auth', 'ip_addresses': ['10.0.0.5']},
+            {'id': 'a3', 'type': 'web', 'business_functions': ['storefront']},
+            {'id': 'a4'}
+        ]
+        
+        assert analyzer.analyze_assets_batch(assets) == [analyzer.analyze_asset_context(a) for a in assets]
+    
+    def test_criticality_keywords_batch_matches_scalar(self):
+        """Test that every criticality keyword classifies the same in batch and per asset."""
+        analyzer = BusinessContextAnalyzer()
+        keywords = list(CRITICALITY_KEYWORDS)
+        # Each keyword alone, and paired with every other to exercise precedence
+        types = keywords + [f'{first}-{second}'.upper() for first in keywords for second in keywords] + ['other']
+        assets = [{'id': asset_type, 'type': asset_type} for asset_type in types]
+        
+        batch = [context['criticality'] for context in analyzer.analyze_assets_batch(assets)]
+        assert batch == [analyzer._assess_criticality(asset) for asset in assets]
+        assert batch[:len(keywords)] == list(CRITICALITY_KEYWORDS.values())
+        assert batch[-1] == 'low'
+    
+    def ingest_json_text(self, text):
+        """Write JSON text to a temporary file and ingest it."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'vulns.json'
+            path.write_text(text)
+            return list(VulnerabilityDataIngester().ingest_json(str(path)))
+    
+    def test_ingest_json_list_root(self):
+        """Test a top-level array of records."""
+        vulnerabilities = self.create_sample_vulnerabilities()
+        
+        assert self.ingest_json_text(json.dumps(vulnerabilities)) == vulnerabilities
+    
+    def test_ingest_json_vulnerabilities_key(self):
+        """Test a wrapper object whose vulnerabilities key follows other keys."""
+        vulnerabilities = self.create_sample_vulnerabilities()
+        document = {
+            'meta': {'vulnerabilities': [{'id': 'NESTED'}], 'count': 2},
+            'source': 'scanner',
+            'vulnerabilities': vulnerabilities
+        }
+        
+        assert self.ingest_json_text(json.dumps(document)) == vulnerabilities
+    
+    def test_ingest_json_single_object(self):
+        """Test a single record object with no vulnerabilities key."""
+        vulnerability = self.create_sample_vulnerabilities()[0]
+        
+        assert self.ingest_json_text(json.dumps(vulnerability)) == [vulnerability]
+    
+    def test_ingest_json_scalar_root(self):
+        """Test that a scalar document is passed through as one value."""
+        assert self.ingest_json_text('"CVE-2024-0001"') == ['CVE-2024-0001']
+        with pytest.raises(ijson.JSONError):
+            self.ingest_json_text('')
+    
+    def test_ingest_csv_short_rows_and_blank_lines(self):
+        """Test CSV ingestion keeps known columns and tolerates ragged rows."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / 'vulns.csv'
+            path.write_text(
+                "id,scanner,title,severity,cvss_score\n"
+                "CVE-2024-0001,nessus,SQL Injection,critical,9.8\n"
+                "\n"
+                "CVE-2024-0002,qualys,Buffer Overflow\n"
+                "\n"
+            )
+            records = list(VulnerabilityDataIngester().ingest_csv(str(path)))
+        
+        assert records == [
+            {'id': 'CVE-2024-0001', 'title': 'SQL Injection', 'severity': 'critical', 'cvss_score': '9.8'},
+            {'id': 'CVE-2024-0002', 'title': 'Buffer Overflow'}
+        ]
+    
+    def test_dashboard_etag_revalidation(self):
+        """Test ETag validators, 304s and the precompressed gzip representation."""
+        client = TestClient(web_dashboard.PRISMDashboard({}, None).app)
+        
+        identity = client.get('/', headers={'Accept-Encoding': 'identity'})
+        assert identity.status_code == 200
+        assert 'content-encoding' not in identity.headers
+        assert identity.text == web_dashboard.DASHBOARD_HTML
+        etag = identity.headers['etag']
+        
+        compressed = client.get('/', headers={'Accept-Encoding': 'gzip'})
+        assert compressed.headers['content-encoding'] == 'gzip'
+        assert compressed.headers['etag'] == etag[:-1] + '-gzip"'
+        assert compressed.text == web_dashboard.DASHBOARD_HTML
+        
+        # Each representation only validates against its own ETag
+        assert client.get('/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}).status_code == 200
+        not_modified = client.get('/', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['etag']
+        })
+        assert not_modified.status_code == 304
+        assert not_modified.content == b''
+        assert 'content-encoding' not in not_modified.headers
+        assert client.get('/', headers={'Accept-Encoding': 'identity', 'If-None-Match': etag}).status_code == 304
+        
+        stats = client.get('/api/stats', headers={'Accept-Encoding': 'identity'})
+        assert stats.json() == {'total': 0, 'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+        revalidated = client.get('/api/stats', headers={
+            'Accept-Encoding': 'identity', 'If-None-Match': '"stale", ' + stats.headers['etag']
+        })
+        assert revalidated.status_code == 304
+    
+    def test_dashboard_static_files(self):
+        """Test that only the plain page is published and the copies are removed on shutdown."""
+        dashboard = web_dashboard.PRISMDashboard({}, None)
+        
+        with TestClient(dashboard.app) as client:
+            assert client.get('/static/index.html').text == web_dashboard.DASHBOARD_HTML
+            assert client.get('/static/index.html.gz').status_code == 404
+        assert not Path(dashboard._static_tmp.name).exists()
+    
+    def test_dashboard_batch(self):
+        """Test /api/batch validation, per-entry errors and the request cap."""
+        client = TestClient(web_dashboard.PRISMDashboard({}, None).app)
+        
+        assert client.post('/api/batch', content=b'not json').status_code == 400
+        assert client.post('/api/batch', json=[{'path': '/health'}]).status_code == 400
+        assert client.post('/api/batch', json={'requests': {'path': '/health'}}).status_code == 400
+        too_many = [{'path': '/health'}] * (web_dashboard.MAX_BATCH_REQUESTS + 1)
+        assert client.post('/api/batch', json={'requests': too_many}).status_code == 400
+        
+        response = client.post('/api/batch', json={
+            'requests': [{'path': '/api/stats'}, {'path': '/health'}, {'path': '/missing'}, 'bad']
+        })
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'total': 0, 'critical': 0, 'high': 0, 'medium': 0, 'low': 0},
+            {'status': 'healthy', 'service': 'prism'},
+            {'error': 'Unsupported batch path: /missing'},
+            {'error': 'Unsupported batch path: None'}
+        ]
+    
+    def test_dashboard_streamed_top_risks(self, monkeypatch):
+        """Test that streamed top risks form a valid JSON array for 0, 1 and N rows."""
+        # Small pages so the stream crosses several keyset boundaries
+        monkeypatch.setattr(database, 'TOP_RISKS_PAGE_ROWS', 2)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = DatabaseManager(str(Path(tmp_dir) / 'prism.db'))
+            dashboard = web_dashboard.PRISMDashboard({}, SimpleNamespace(db_manager=db))
+            
+            with TestClient(dashboard.app) as client:
+                assert client.get('/api/top-risks', params={'limit': 5}).json() == []
+                
+                vulnerabilities = self.create_sample_vulnerabilities() + [
+                    {'id': 'CVE-2024-0003', 'title': 'Open Redirect', 'severity': 'medium', 'cvss_score': 7.5},
+                    {'id': 'CVE-2024-0004', 'title': 'Info Leak', 'severity': 'low', 'cvss_score': None}
+                ]
+                db.store_vulnerabilities(vulnerabilities)
+                # Already in (cvss_score DESC, id) order, with the NULL score last
+                expected = [
+                    {key: vuln[key] for key in ('id', 'title', 'severity', 'cvss_score')}
+                    for vuln in vulnerabilities
+                ]
+                
+                assert client.get('/api/top-risks', params={'limit': 1}).json() == expected[:1]
+                assert client.get('/api/top-risks', params={'limit': 10}).json() == expected
+                assert client.get('/api/top-risks', params={'limit': 0}).status_code == 422
+                client.portal.call(db.aclose)
+    
+    def test_top_risk_struct_allows_null_columns(self):
+        """Test that TopRisk round-trips rows with NULL title, severity and score."""
+        row = {'id': 'CVE-2024-0005', 'title': None, 'severity': None, 'cvss_score': None}
+        encoded = web_dashboard.PAYLOAD_ENCODER.encode([web_dashboard.TopRisk(**row)])
+        
+        assert json.loads(encoded) == [row]
+        assert msgspec.json.decode(encoded, type=List[web_dashboard.TopRisk]) == [web_dashboard.TopRisk(**row)]
+    
+    def test_report_write_bytes_short_writes_and_fallback(self, monkeypatch, tmp_path):
+        """Test that report writes survive short writev calls and platforms without writev."""
+        monkeypatch.chdir(tmp_path)
+        generator = ReportGenerator()
+        chunks = (b'<html>', b'', b'executive summary', b'</html>')
+        writev = os.writev
+        
+        # Accept at most three bytes per call to force the remainder loop
+        monkeypatch.setattr(os, 'writev', lambda fd, buffers: writev(fd, [bytes(buffers[0][:3])]))
+        generator._write_bytes(tmp_path / 'short.html', *chunks)
+        assert (tmp_path / 'short.html').read_bytes() == b''.join(chunks)
+        
+        monkeypatch.delattr(os, 'writev')
+        generator._write_bytes(tmp_path / 'fallback.html', *chunks)
+        assert (tmp_path / 'fallback.html').read_bytes() == b''.join(chunks)
+    
+    def test_config_cache_rejects_loose_permissions(self, monkeypatch, tmp_path):
+        """Test that the pickled config cache is only trusted when private to this user."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(prism, 'CONFIG_CACHE_DIR', tmp_path / 'cache')
+        app = prism.PRISM(str(tmp_path / 'prism.yaml'))
+        cache_key = ('config', 1)
+        app._write_config_cache(cache_key, {'feeds': {'api_key': 'secret'}})
+        cache_path = app._config_cache_path()
+        
+        assert cache_path.stat().st_mode & 0o777 == 0o600
+        assert app._read_config_cache(cache_key) == {'feeds': {'api_key': 'secret'}}
+        
+        cache_path.chmod(0o644)
+        assert app._read_config_cache(cache_key) is None
+        cache_path.chmod(0o600)
+        (tmp_path / 'cache').chmod(0o777)
+        assert app._read_config_cache(cache_key) is None
+        
+        app.db_manager.close()
+
 if __name__ == "__main__":
     print("PRISM Integration Tests Ready")
@@ -3,11 +3,14 @@ Threat Intelligence Manager for PRISM
 Integrates with various threat intelligence feeds.
 """
 
-import requests
+import asyncio
+import aiohttp
 import logging
 from typing import Dict, List
 from datetime import datetime
 
+from http_client import create_session, fetch_json
+
 class ThreatIntelligenceManager:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -15,24 +18,39 @@ class ThreatIntelligenceManager:
             'cisa_kev': 'https://www.cisa.gov/sites/default/files/feeds/known_exploited_vulnerabilities.json',
             'epss': 'https://api.first.org/data/v1/epss'
         }
+        self._session = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled HTTP session on first use."""
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+        return self._session
     
-    def update_feeds(self) -> Dict:
-        """Update threat intelligence feeds."""
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def update_feeds(self) -> Dict:
+        """Update threat intelligence feeds concurrently."""
+        outcomes = await asyncio.gather(
+            *(self._update_feed(feed_name, feed_url) for feed_name, feed_url in self.feeds.items()),
+            return_exceptions=True
+        )
+        
         results = {}
-        for feed_name, feed_url in self.feeds.items():
-            try:
-                result = self._update_feed(feed_name, feed_url)
-                results[feed_name] = result
-            except Exception as e:
-                self.logger.error(f"Failed to update {feed_name}: {e}")
-                results[feed_name] = {'error': str(e)}
+        for feed_name, outcome in zip(self.feeds, outcomes):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Failed to update {feed_name}: {outcome}")
+                results[feed_name] = {'error': str(outcome)}
+            else:
+                results[feed_name] = outcome
         return results
     
-    def _update_feed(self, name: str, url: str) -> Dict:
+    async def _update_feed(self, name: str, url: str) -> Dict:
         """Update a specific feed."""
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+        data = await fetch_json(self._get_session(), url)
         
         if name == 'cisa_kev':
             return self._process_kev_data(data)
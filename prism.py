@@ -9,8 +9,12 @@ License: MIT
 
 import argparse
 import asyncio
+import hashlib
 import json
 import logging
+import os
+import pickle
+import stat
 import sys
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -24,6 +28,21 @@ from web_dashboard import launch_dashboard
 from report_generator import ReportGenerator
 from database import DatabaseManager
 
+# libyaml's C loader parses an order of magnitude faster when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+CONFIG_CACHE_DIR = Path.home() / '.cache' / 'prism'
+
+# Local sources at least this large (~100k records) rebuild indexes once after the load
+DEFER_INDEX_BYTES = 20 * 1024 * 1024
+
+def _is_private(st: os.stat_result, is_type, forbidden_mode: int) -> bool:
+    """Whether a stat result is of the expected type, owned by this user, and without forbidden mode bits."""
+    getuid = getattr(os, 'getuid', None)
+    if getuid is None:
+        # Without POSIX ownership (Windows) the cache is not trusted at all
+        return False
+    return is_type(st.st_mode) and st.st_uid == getuid() and not st.st_mode & forbidden_mode
+
 class PRISM:
     """Main PRISM application class for vulnerability prioritization."""
     
@@ -49,12 +68,54 @@ class PRISM:
             return self._create_default_config()
         
         try:
-            with open(self.config_path, 'r') as f:
-                return yaml.safe_load(f)
+            cache_key = (str(self.config_path.resolve()), self.config_path.stat().st_mtime_ns)
+            config = self._read_config_cache(cache_key)
+            if config is None:
+                with open(self.config_path, 'r') as f:
+                    config = yaml.load(f, Loader=YAML_LOADER)
+                self._write_config_cache(cache_key, config)
+            return config
         except Exception as e:
             print(f"Error loading config: {e}")
             return self._create_default_config()
     
+    def _config_cache_path(self) -> Path:
+        """Per-config cache file, so switching between config files doesn't evict the cache."""
+        digest = hashlib.sha256(str(self.config_path.resolve()).encode('utf-8')).hexdigest()[:16]
+        return CONFIG_CACHE_DIR / f'config-{digest}.pkl'
+    
+    def _read_config_cache(self, cache_key) -> Optional[Dict]:
+        """Return the cached parsed config if it matches the file's path and mtime."""
+        # Unpickling runs code, so only trust a cache nobody else could have written
+        try:
+            if not _is_private(os.lstat(CONFIG_CACHE_DIR), stat.S_ISDIR, 0o022):
+                return None
+            fd = os.open(self._config_cache_path(), os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+            with os.fdopen(fd, 'rb') as f:
+                if not _is_private(os.fstat(f.fileno()), stat.S_ISREG, 0o077):
+                    return None
+                cached_key, config = pickle.load(f)
+        except Exception:
+            return None
+        return config if cached_key == cache_key else None
+    
+    def _write_config_cache(self, cache_key, config: Dict):
+        """Cache the parsed config; failures only cost the next startup a YAML parse."""
+        cache_path = self._config_cache_path()
+        tmp_path = cache_path.with_name(f'{cache_path.name}.{os.getpid()}.tmp')
+        try:
+            CONFIG_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if not _is_private(os.lstat(CONFIG_CACHE_DIR), stat.S_ISDIR, 0o022):
+                return
+            # Owner-only, since the config can carry feed API keys; renamed into place so
+            # concurrent dashboard workers never read a partial file
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((cache_key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    
     def _create_default_config(self) -> Dict:
         """Create default configuration."""
         default_config = {
@@ -88,28 +149,34 @@ class PRISM:
         
         return logging.getLogger('PRISM')
     
-    async def ingest_vulnerabilities(self, source_path: str, source_type: str = 'auto') -> Dict:
+    async def ingest_vulnerabilities(self, source_path: str, source_type: str = 'auto',
+                                     defer_indexes: Optional[bool] = None) -> Dict:
         """Ingest vulnerabilities from various sources."""
         self.logger.info(f"Ingesting vulnerabilities from {source_path}")
         
+        # Records arrive as a stream of unknown length, so size up large loads from the file
+        if defer_indexes is None:
+            source = Path(source_path)
+            defer_indexes = source_type != 'api' and source.is_file() and source.stat().st_size >= DEFER_INDEX_BYTES
+        
         try:
             if source_type == 'json' or source_path.endswith('.json'):
                 vulns = self.data_ingester.ingest_json(source_path)
             elif source_type == 'csv' or source_path.endswith('.csv'):
                 vulns = self.data_ingester.ingest_csv(source_path)
             elif source_type == 'api':
-                vulns = self.data_ingester.ingest_api(source_path)
+                vulns = await self.data_ingester.ingest_api(source_path)
             else:
                 raise ValueError(f"Unsupported source type: {source_type}")
             
+            # Every source yields rows lazily, so parse -> normalize -> store is a
+            # single pass that only ever buffers one insert chunk. Parsing and
+            # SQLite writes block, so the pass runs in a worker thread.
             processed = self.data_ingester.process_vulnerabilities(vulns)
+            count = await asyncio.to_thread(self.db_manager.store_vulnerabilities, processed, defer_indexes)
             
-            # Store in database
-            for vuln in processed:
-                self.db_manager.store_vulnerability(vuln)
-            
-            self.logger.info(f"Successfully ingested {len(processed)} vulnerabilities")
-            return {'count': len(processed), 'format': source_type}
+            self.logger.info(f"Successfully ingested {count} vulnerabilities")
+            return {'count': count, 'format': source_type}
             
         except Exception as e:
             self.logger.error(f"Failed to ingest vulnerabilities: {e}")
@@ -126,10 +193,16 @@ class PRISM:
         """Generate vulnerability risk reports."""
         return await self.report_generator.generate(report_type)
     
+    async def close(self):
+        """Release resources held by PRISM components."""
+        await self.data_ingester.close()
+        await self.intel_manager.close()
+        await self.db_manager.aclose()
+    
     async def launch_web_dashboard(self):
         """Launch the interactive web dashboard."""
         dashboard_config = self.config.get('web_dashboard', {})
-        await launch_dashboard(dashboard_config)
+        await launch_dashboard(dashboard_config, self)
 
 def create_parser() -> argparse.ArgumentParser:
     """Create command line argument parser."""
@@ -147,6 +220,8 @@ def create_parser() -> argparse.ArgumentParser:
     ingest_parser.add_argument('--source', '-s', required=True, help='Source file or URL')
     ingest_parser.add_argument('--type', '-t', choices=['json', 'csv', 'api', 'auto'],
                               default='auto', help='Source data type')
+    ingest_parser.add_argument('--defer-indexes', action='store_true', default=None,
+                              help='Drop secondary indexes during the load and rebuild them after')
     
     # Dashboard command
     dashboard_parser = subparsers.add_parser('dashboard', help='Launch web dashboard')
@@ -169,11 +244,12 @@ async def main():
         parser.print_help()
         return
     
+    prism = None
     try:
         prism = PRISM(config_path=args.config)
         
         if args.command == 'ingest':
-            result = await prism.ingest_vulnerabilities(args.source, args.type)
+            result = await prism.ingest_vulnerabilities(args.source, args.type, args.defer_indexes)
             print(f"Ingested {result['count']} vulnerabilities successfully")
         
         elif args.command == 'dashboard':
@@ -190,6 +266,10 @@ async def main():
     except Exception as e:
         print(f"Error executing command: {e}")
         sys.exit(1)
+    
+    finally:
+        if prism is not None:
+            await prism.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
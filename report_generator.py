@@ -3,16 +3,34 @@ Report Generator for PRISM
 Generates executive and technical vulnerability risk reports.
 """
 
+import asyncio
 import logging
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List
 
+import jinja2
+
+TEMPLATE_DIR = Path(__file__).parent / 'templates'
+
 class ReportGenerator:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.output_dir = Path('reports')
         self.output_dir.mkdir(exist_ok=True)
+        
+        # Templates are parsed once and reused for every report
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(TEMPLATE_DIR)),
+            autoescape=jinja2.select_autoescape(['html']),
+            auto_reload=False
+        )
+        self.executive_template = self.env.get_template('executive.html')
+        self.technical_template = self.env.get_template('technical.html')
+        
+        # The executive summary takes no context, so render it once up front
+        self.executive_html = self.executive_template.render().encode('utf-8')
     
     async def generate(self, report_type: str = 'executive') -> str:
         """Generate vulnerability risk report."""
@@ -28,27 +46,7 @@ class ReportGenerator:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_path = self.output_dir / f"executive_report_{timestamp}.html"
         
-        report_content = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>PRISM Executive Risk Report</title></head>
-        <body>
-            <h1>Executive Vulnerability Risk Summary</h1>
-            <h2>Key Risk Metrics</h2>
-            <ul>
-                <li>Total Vulnerabilities: 150</li>
-                <li>Critical Risk: 12 (8%)</li>
-                <li>High Risk: 34 (23%)</li>
-                <li>Remediation Priority: Focus on 12 critical vulnerabilities</li>
-            </ul>
-            <h2>Recommendations</h2>
-            <p>Immediate action required for critical vulnerabilities affecting internet-facing assets.</p>
-        </body>
-        </html>
-        """
-        
-        with open(output_path, 'w') as f:
-            f.write(report_content)
+        await asyncio.to_thread(self._write_bytes, output_path, self.executive_html)
         
         return str(output_path)
     
@@ -57,23 +55,35 @@ class ReportGenerator:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_path = self.output_dir / f"technical_report_{timestamp}.html"
         
-        report_content = """
-        <!DOCTYPE html>
-        <html>
-        <head><title>PRISM Technical Risk Report</title></head>
-        <body>
-            <h1>Technical Vulnerability Analysis</h1>
-            <h2>Detailed Risk Breakdown</h2>
-            <table border="1">
-                <tr><th>CVE ID</th><th>Risk Score</th><th>CVSS</th><th>Asset</th></tr>
-                <tr><td>CVE-2024-0001</td><td>9.8</td><td>9.3</td><td>web-server-01</td></tr>
-                <tr><td>CVE-2024-0002</td><td>8.5</td><td>7.5</td><td>db-server-01</td></tr>
-            </table>
-        </body>
-        </html>
-        """
-        
-        with open(output_path, 'w') as f:
-            f.write(report_content)
+        vulnerabilities = [
+            {'id': 'CVE-2024-0001', 'risk_score': 9.8, 'cvss_score': 9.3, 'asset': 'web-server-01'},
+            {'id': 'CVE-2024-0002', 'risk_score': 8.5, 'cvss_score': 7.5, 'asset': 'db-server-01'}
+        ]
+        await self._render(self.technical_template, output_path, vulnerabilities=vulnerabilities)
         
         return str(output_path)
+    
+    async def _render(self, template: jinja2.Template, output_path: Path, **context):
+        """Stream a rendered template to disk without blocking the event loop."""
+        await asyncio.to_thread(template.stream(**context).dump, str(output_path))
+    
+    def _write_bytes(self, output_path: Path, *chunks: bytes):
+        """Write prebuilt byte chunks to disk, gathered into writev calls where available."""
+        if not hasattr(os, 'writev'):
+            # Windows has no writev
+            with open(output_path, 'wb') as f:
+                f.write(b''.join(chunks))
+            return
+        
+        views = [memoryview(chunk) for chunk in chunks if chunk]
+        fd = os.open(output_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while views:
+                written = os.writev(fd, views)
+                # A short write leaves a remainder: drop whole chunks, then trim a partial one
+                while views and written >= len(views[0]):
+                    written -= len(views.pop(0))
+                if views:
+                    views[0] = views[0][written:]
+        finally:
+            os.close(fd)